@@ -1,5 +1,7 @@
 import pickle
-from flask import Flask, request, jsonify
+import numpy as np
+import orjson
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import os
 import sys
@@ -7,37 +9,61 @@ import sys
 # Initialize the Flask application
 app = Flask(__name__)
 # Enable CORS (Cross-Origin Resource Sharing) to allow our HTML page
-# to make requests to this server
-CORS(app)
+# to make requests to this server.
+# Scope it to just the two API routes and GET, and set FRONTEND_ORIGIN
+# when deploying so only the real frontend is whitelisted ('*' keeps
+# local development working). max_age lets browsers cache the preflight
+# answer for a day instead of sending an OPTIONS round-trip per request.
+frontend_origin = os.environ.get('FRONTEND_ORIGIN', '*')
+CORS(app,
+     resources={r"/movies": {"origins": frontend_origin},
+                r"/recommend": {"origins": frontend_origin}},
+     methods=["GET"],
+     max_age=86400)
 
 # --- LOAD THE MODEL FILES ---
 # Define paths to the model files
 movies_path = 'movies.pkl'
-similarity_path = 'similarity.pkl'
+top5_path = 'top5.npy'
 
 # Check if the model files exist
-if not (os.path.exists(movies_path) and os.path.exists(similarity_path)):
+if not (os.path.exists(movies_path) and os.path.exists(top5_path)):
     print("--------------------------------------------------", file=sys.stderr)
     print(f"Error: Model files not found.", file=sys.stderr)
-    print(f"Please run 'recommendation_model.py' first to create 'movies.pkl' and 'similarity.pkl'.", file=sys.stderr)
+    print(f"Please run 'recommendation_model.py' first to create 'movies.pkl' and 'top5.npy'.", file=sys.stderr)
     print("--------------------------------------------------", file=sys.stderr)
     sys.exit(1) # Exit the script if files are missing
 
 try:
-    # Load the processed movie data (a list of dictionaries)
+    # Load the movie titles (a plain list of strings, aligned with the
+    # rows of the similarity matrix)
     with open(movies_path, 'rb') as f:
-        movies_list = pickle.load(f)
-    
-    # Load the cosine similarity matrix
-    with open(similarity_path, 'rb') as f:
-        similarity = pickle.load(f)
-        
-    # Create a simpler list of just movie titles for the dropdown
-    movie_titles = [movie['title'] for movie in movies_list]
-    
-    # Create a mapping from title to its index in the similarity matrix
-    # This is crucial for fast lookups
-    title_to_index = {movie['title']: i for i, movie in enumerate(movies_list)}
+        movie_titles = pickle.load(f)
+
+    # Load the precomputed (N, 5) recommendation table - the row for a
+    # movie *is* its top-5 answer, so no similarity scores are needed at
+    # serve time. Rows with fewer than 5 matches are padded with -1.
+    top5 = np.load(top5_path)
+
+    # Keep the titles in a sorted numpy array and look them up with
+    # binary search instead of a Python dict: same speed at this size,
+    # but a fraction of the memory, and it stays cheap if the catalog
+    # grows. Payloads are stored aligned with the sorted order.
+    sorted_order = sorted(range(len(movie_titles)), key=movie_titles.__getitem__)
+    sorted_titles = np.array([movie_titles[i] for i in sorted_order])
+
+    # Serialize every movie's top-5 answer up front in one batch pass
+    # over the table (one scan at startup, instead of lazy per-title
+    # work on the request threads). Serving a request is then a binary
+    # search plus a list index; ~1 MB total for the full catalog.
+    sorted_payloads = [
+        orjson.dumps([movie_titles[j] for j in top5[i] if j >= 0])
+        for i in sorted_order
+    ]
+
+    # The catalog never changes while the server runs, so serialize the
+    # (already sorted) dropdown list once here too
+    movies_json = orjson.dumps(sorted_titles.tolist())
 
     print("Model files loaded successfully.", file=sys.stderr)
 
@@ -54,9 +80,9 @@ def get_movies():
     Endpoint to get the list of all movie titles.
     This populates the dropdown on the frontend.
     """
-    # Sort the titles alphabetically for a user-friendly dropdown
-    sorted_titles = sorted(movie_titles)
-    return jsonify(sorted_titles)
+    # The alphabetically sorted list is precomputed and serialized at
+    # startup; just hand the bytes to the client
+    return Response(movies_json, mimetype='application/json')
 
 @app.route('/recommend', methods=['GET'])
 def recommend():
@@ -71,39 +97,22 @@ def recommend():
         # Return an error if the 'movie' parameter is missing
         return jsonify({'error': 'Movie title parameter is required.'}), 400
         
-    if movie_title not in title_to_index:
+    # Binary-search the sorted title array; every answer was serialized
+    # at startup, so a hit is just a list index plus the socket write
+    pos = int(np.searchsorted(sorted_titles, movie_title))
+
+    if pos == len(sorted_titles) or sorted_titles[pos] != movie_title:
         # Return an error if the movie title is not in our dataset
         return jsonify({'error': 'Movie not found.'}), 404
 
-    try:
-        # --- THIS IS THE FIX ---
-        # Find the index of the movie using our lookup map
-        movie_index = title_to_index[movie_title]
-        # ---------------------
-        
-        # Get the similarity scores for that movie from the matrix
-        distances = similarity[movie_index]
-        
-        # Sort the movies based on similarity (top 5)
-        # We get indices [1:6] to skip the movie itself (which has a score of 1.0)
-        movies_list_indices = sorted(list(enumerate(distances)), reverse=True, key=lambda x: x[1])[1:6]
-        
-        # Get the titles from the indices
-        recommended_movies = []
-        for i in movies_list_indices:
-            movie_idx = i[0] # The index of the recommended movie
-            recommended_movies.append(movies_list[movie_idx]['title'])
-            
-        # Return the list of 5 movie titles as JSON
-        return jsonify(recommended_movies)
-        
-    except Exception as e:
-        print(f"Error getting recommendation: {e}", file=sys.stderr)
-        return jsonify({'error': 'Internal server error.'}), 500
+    return Response(sorted_payloads[pos], mimetype='application/json')
 
 # --- RUN THE APP ---
+# Running this file directly starts the single-threaded Werkzeug dev
+# server - fine for development, but it serializes all requests.
+# In production run under gunicorn instead (see gunicorn.conf.py):
+#     gunicorn app:app
 if __name__ == '__main__':
-    print("Starting Flask server at http://127.0.0.1:5000", file=sys.stderr)
-    # Runs the server in debug mode for development
+    print("Starting Flask development server at http://127.0.0.1:5000", file=sys.stderr)
     app.run(debug=True, port=5000)
 
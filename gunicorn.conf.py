@@ -0,0 +1,14 @@
+# Gunicorn configuration for the recommendation API.
+# Run with: gunicorn app:app
+import os
+
+bind = "127.0.0.1:5000"
+
+# One worker per core; each request is a table lookup, so workers spend
+# their time on socket I/O and more processes means more throughput
+workers = os.cpu_count()
+
+# Load the model files once in the master before forking, so all workers
+# share the title list and recommendation table via copy-on-write pages
+# instead of each loading a private copy
+preload_app = True
@@ -1,8 +1,8 @@
 import pandas as pd
 import numpy as np
-import ast # For safely evaluating string representations of lists/dicts
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import re # For extracting names from the JSON-like feature columns
+from sklearn.feature_extraction.text import HashingVectorizer
+from sparse_dot_topn import awesome_cossim_topn
 import pickle
 import os
 
@@ -41,48 +41,42 @@ print("Merged and cleaned data.")
 
 # --- 3. FEATURE ENGINEERING ---
 # The 'genres', 'keywords', 'cast', and 'crew' columns are strings
-# containing JSON-like structures. We need to parse them.
+# containing JSON structures. We only ever need the "name" values, so
+# instead of running the full Python AST parser on every row
+# (ast.literal_eval was the dominant cost of this script), we pull the
+# names out directly with precompiled regexes. The regex engine runs in
+# C and never builds the intermediate lists of dicts.
 
-def safe_literal_eval(s):
-    """Safely evaluate a string that looks like a Python literal."""
-    try:
-        # ast.literal_eval is safer than eval()
-        return ast.literal_eval(s)
-    except (ValueError, SyntaxError):
-        return []
+NAME_RE = re.compile(r'"name":\s*"([^"]+)"')
+DIRECTOR_RE = re.compile(r'"job":\s*"Director".*?"name":\s*"([^"]+)"')
 
 # Helper function to get a list of names from 'genres' or 'keywords'
 def get_names(obj_string):
-    obj_list = safe_literal_eval(obj_string)
-    if not isinstance(obj_list, list):
-        return []
-    return [item['name'].replace(" ", "") for item in obj_list if 'name' in item]
-
-# Helper function to get the top 3 actors
-def get_actors(obj_string):
-    obj_list = safe_literal_eval(obj_string)
-    if not isinstance(obj_list, list):
-        return []
-    actors = [item['name'].replace(" ", "") for item in obj_list if 'name' in item]
-    return actors[:3] # Return only the top 3 actors
-
-# Helper function to get the director
-def get_director(obj_string):
-    obj_list = safe_literal_eval(obj_string)
-    if not isinstance(obj_list, list):
-        return [] # Return an empty list on failure
-    for item in obj_list:
-        if 'job' in item and item['job'] == 'Director' and 'name' in item:
-            return [item['name'].replace(" ", "")] # Return a list with the director's name
-    return [] # Return an empty list if no director is found
+    return [name.replace(" ", "") for name in NAME_RE.findall(obj_string)]
+
+# Helper function to get the top 3 actors and the director together,
+# so each row is visited once instead of once per column
+def parse_credits(cast_string, crew_string):
+    actors = [name.replace(" ", "") for name in NAME_RE.findall(cast_string)[:3]]
+    match = DIRECTOR_RE.search(crew_string)
+    if match:
+        director = [match.group(1).replace(" ", "")]
+    else:
+        director = [] # No director credited
+    return actors, director
 
 print("Applying feature engineering...")
 
 # Apply the helper functions to extract the features
 movies['genres'] = movies['genres'].apply(get_names)
 movies['keywords'] = movies['keywords'].apply(get_names) # <-- This is the corrected line
-movies['cast'] = movies['cast'].apply(get_actors)
-movies['director'] = movies['crew'].apply(get_director)
+
+# Extract cast and director in a single sweep over the rows rather than
+# two separate .apply passes
+parsed_credits = [parse_credits(cast, crew)
+                  for cast, crew in zip(movies['cast'], movies['crew'])]
+movies['cast'] = [actors for actors, _ in parsed_credits]
+movies['director'] = [director for _, director in parsed_credits]
 
 # We don't need the 'crew' column anymore
 movies = movies.drop('crew', axis=1)
@@ -104,37 +98,62 @@ final_movies = movies[['id', 'title', 'tags']]
 print("Feature engineering complete. 'tags' column created.")
 
 # --- 4. MODEL BUILDING (VECTORIZATION) ---
-# Use CountVectorizer to convert the text 'tags' into a matrix of word counts
-# max_features=5000: We'll use the 5000 most common words
-# stop_words='english': We'll ignore common English words (like 'the', 'a', 'is')
-cv = CountVectorizer(max_features=5000, stop_words='english')
+# Use HashingVectorizer to convert the text 'tags' into a sparse matrix.
+# It needs no vocabulary fit (single pass), and with norm='l2' the rows
+# come out already normalized for cosine similarity.
+# alternate_sign=False keeps all counts non-negative.
+hv = HashingVectorizer(n_features=2**14, stop_words='english',
+                       norm='l2', alternate_sign=False)
 
-# Fit and transform the 'tags' column
-vectors = cv.fit_transform(final_movies['tags']).toarray()
+# Transform the 'tags' column (stays sparse)
+vectors = hv.transform(final_movies['tags'])
 
 print("Vectorization complete.")
 
 # --- 5. CALCULATE SIMILARITY ---
-# Calculate the cosine similarity between all movie vectors
-similarity = cosine_similarity(vectors)
-
-print("Cosine similarity calculated.")
+# We never need the full NxN similarity matrix, only the best 5 matches
+# per movie. awesome_cossim_topn computes the sparse dot product with a
+# C++ priority-queue kernel that keeps just the top 6 entries per row
+# (the best match is the movie itself), so the result is a tiny CSR
+# matrix instead of a ~184 MB dense one. The kernel splits the rows
+# across all cores, so the build step scales with the machine.
+similarity = awesome_cossim_topn(vectors, vectors.T, ntop=6, lower_bound=0.0,
+                                 use_threads=True, n_jobs=os.cpu_count())
+
+print("Top-6 cosine similarity calculated.")
+
+# The catalog is static, so we can resolve the final answer right here:
+# a (N, 5) table of the top-5 recommendation indices per movie. The API
+# then needs no similarity scores at all - just ~96 KB of int32 indices.
+# Rows with fewer than 5 matches are padded with -1.
+top5 = np.full((similarity.shape[0], 5), -1, dtype=np.int32)
+for i in range(similarity.shape[0]):
+    start, end = similarity.indptr[i], similarity.indptr[i + 1]
+    cols = similarity.indices[start:end]
+    order = np.argsort(similarity.data[start:end])[::-1]
+    picks = [j for j in cols[order] if j != i][:5]
+    top5[i, :len(picks)] = picks
+
+print("Top-5 recommendation table built.")
 
 # --- 6. SAVE THE MODEL ---
 # We save the processed 'final_movies' dataframe and the 'similarity' matrix
 # 'pickle' is used to serialize Python objects into files
 
 try:
-    # Save the movie list (as a list of dictionaries for easier use in the API)
+    # Save just the list of titles. The API only ever looks titles up by
+    # index, so shipping the 'id' and 'tags' columns too would waste tens
+    # of MB of pickle and RAM for nothing.
     with open('movies.pkl', 'wb') as f:
-        pickle.dump(final_movies.to_dict('records'), f)
-        
-    # Save the similarity matrix
-    with open('similarity.pkl', 'wb') as f:
-        pickle.dump(similarity, f)
-        
+        pickle.dump(final_movies['title'].tolist(), f, protocol=5)
+
+
+    # Save the precomputed recommendation table; the similarity scores
+    # themselves are no longer needed at serve time
+    np.save('top5.npy', top5)
+
     print("\nSUCCESS!")
-    print("Model built and saved as 'movies.pkl' and 'similarity.pkl'.")
+    print("Model built and saved as 'movies.pkl' and 'top5.npy'.")
     
     # --- 7. EXAMPLE USAGE ---
     print("\n--- EXAMPLE RECOMMENDATION ---")
@@ -143,14 +162,11 @@ try:
         try:
             # Find the index of the movie
             movie_index = final_movies[final_movies['title'] == movie_title].index[0]
-            # Get the similarity scores for that movie
-            distances = similarity[movie_index]
-            # Sort the movies based on similarity (top 5)
-            movies_list = sorted(list(enumerate(distances)), reverse=True, key=lambda x: x[1])[1:6]
-            
+            # The answer is already sitting in the precomputed table
             print(f"Recommendations for '{movie_title}':")
-            for i in movies_list:
-                print(final_movies.iloc[i[0]].title)
+            for idx in top5[movie_index]:
+                if idx >= 0:
+                    print(final_movies.iloc[idx].title)
         except (IndexError, KeyError):
             print(f"Movie '{movie_title}' not found in the dataset.")
 